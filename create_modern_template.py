@@ -2,6 +2,7 @@ from pptx import Presentation
 from pptx.util import Inches, Pt
 from pptx.enum.shapes import MSO_SHAPE
 from pptx.dml.color import RGBColor
+from slides.services import pptx_fastpatch  # noqa: F401 (patches python-pptx on import)
 
 def create_modern_template():
     prs = Presentation()
@@ -39,10 +40,8 @@ def create_modern_template():
     title_slide_layout = prs.slide_layouts[0]
     title_and_content = prs.slide_layouts[1]
     two_content = prs.slide_layouts[3] # Good for Text + Image
-    try:
-        picture_caption = prs.slide_layouts[8] # Often Picture with Caption
-    except:
-        picture_caption = two_content
+    # Often Picture with Caption
+    picture_caption = prs.slide_layouts[8] if len(prs.slide_layouts) > 8 else two_content
         
     # Let's verify what placeholders exist on "Two Content" (Layout 3)
     # Usually: Title, Content Placeholder 1 (Left), Content Placeholder 2 (Right)
@@ -6,20 +6,83 @@ This script demonstrates various slide layouts and features available in python-
 from pptx import Presentation
 from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN
+from pptx.enum.shapes import MSO_SHAPE
 from pptx.dml.color import RGBColor
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls, qn
+from xml.sax.saxutils import escape
+from slides.services import pptx_fastpatch  # noqa: F401 (patches python-pptx on import)
 
-def create_presentation():
-    """Create a PowerPoint presentation with various layout examples"""
+
+# Colors shared across slides (built once instead of per shape)
+WHITE = RGBColor(0xFF, 0xFF, 0xFF)
+NAVY = RGBColor(0x00, 0x33, 0x66)
+BLUE = RGBColor(0x00, 0x70, 0xC0)
+GREEN = RGBColor(0x00, 0xB0, 0x50)
+ORANGE = RGBColor(0xFF, 0x7F, 0x27)
+PURPLE = RGBColor(0x80, 0x00, 0x80)
+GREY_FILL = RGBColor(0xDC, 0xDC, 0xDC)
+GREY_LINE = RGBColor(0x96, 0x96, 0x96)
+GREY_TEXT = RGBColor(0x64, 0x64, 0x64)
+
+# Slide 8 boxes: (fill color, label, horizontal offset from the first box)
+BOXES = [
+    (BLUE, "Placeholder\nBox 1", 0),
+    (GREEN, "Placeholder\nBox 2", Inches(2.5)),
+    (ORANGE, "Placeholder\nBox 3", Inches(5)),
+]
+
+
+def set_bullets(tf, lines, levels=None):
+    """Replace all paragraphs of a text frame with `lines` in one XML parse.
+
+    Equivalent to setting `tf.text` and calling `tf.add_paragraph()` per line, but the
+    paragraphs are built as a single string and parsed once. `levels` optionally gives
+    the indent level of each line.
+    """
+    levels = levels or [0] * len(lines)
+    paragraphs = "".join(
+        (f'<a:p><a:pPr lvl="{level}"/>' if level else "<a:p>")
+        + f"<a:r><a:t>{escape(line)}</a:t></a:r></a:p>"
+        for line, level in zip(lines, levels)
+    )
+    new_body = parse_xml(f"<a:txBody {nsdecls('a')}>{paragraphs}</a:txBody>")
+    
+    txBody = tf._txBody
+    for p in txBody.findall(qn("a:p")):
+        txBody.remove(p)
+    txBody.extend(new_body.iterchildren())
+
+def _add_colored_box(slide, left, top, width, height, rgb, text, pt=18, shape_type=MSO_SHAPE.RECTANGLE):
+    """Add a solid-filled shape with centered white label text."""
+    shape = slide.shapes.add_shape(shape_type, left, top, width, height)
+    shape.fill.solid()
+    shape.fill.fore_color.rgb = rgb
+    tf = shape.text_frame
+    tf.text = text
+    p = tf.paragraphs[0]
+    p.font.color.rgb = WHITE
+    p.font.size = Pt(pt)
+    p.alignment = PP_ALIGN.CENTER
+    return shape
+
+def create_presentation(verbose=True):
+    """Create a PowerPoint presentation with various layout examples
+    
+    Progress output goes to stdout only when `verbose` is set, so the function can
+    also be called quietly (e.g. from a request handler).
+    """
+    log = print if verbose else (lambda *args, **kwargs: None)
     
     # Create presentation object
     prs = Presentation()
     
     # Get the slide layouts available in the default template
-    print("Available slide layouts in default template:")
+    log("Available slide layouts in default template:")
     for i, layout in enumerate(prs.slide_layouts):
-        print(f"  Layout {i}: {layout.name}")
+        log(f"  Layout {i}: {layout.name}")
     
-    print("\nCreating presentation with various layouts...\n")
+    log("\nCreating presentation with various layouts...\n")
     
     # ========== Slide 1: Title Slide ==========
     slide_layout = prs.slide_layouts[0]  # Title Slide layout
@@ -30,7 +93,7 @@ def create_presentation():
     
     title.text = "Python-PPTX Template Explorer"
     subtitle.text = "Exploring Different Slide Layouts and Features\nGenerated with python-pptx"
-    print("✓ Created Slide 1: Title Slide")
+    log("✓ Created Slide 1: Title Slide")
     
     # ========== Slide 2: Title and Content ==========
     slide_layout = prs.slide_layouts[1]  # Title and Content layout
@@ -41,27 +104,15 @@ def create_presentation():
     
     # Access the content placeholder
     content = slide.placeholders[1]
-    tf = content.text_frame
-    tf.text = "This is the main content area"
-    
-    # Add bullet points
-    p = tf.add_paragraph()
-    p.text = "First bullet point - placeholder text"
-    p.level = 0
-    
-    p = tf.add_paragraph()
-    p.text = "Second bullet point - more placeholder content"
-    p.level = 1
-    
-    p = tf.add_paragraph()
-    p.text = "Third bullet point - nested content"
-    p.level = 2
-    
-    p = tf.add_paragraph()
-    p.text = "Fourth bullet point - back to main level"
-    p.level = 0
+    set_bullets(content.text_frame, [
+        "This is the main content area",
+        "First bullet point - placeholder text",
+        "Second bullet point - more placeholder content",
+        "Third bullet point - nested content",
+        "Fourth bullet point - back to main level",
+    ], levels=[0, 0, 1, 2, 0])
     
-    print("✓ Created Slide 2: Title and Content")
+    log("✓ Created Slide 2: Title and Content")
     
     # ========== Slide 3: Section Header ==========
     slide_layout = prs.slide_layouts[2]  # Section Header layout
@@ -73,7 +124,7 @@ def create_presentation():
     subtitle = slide.placeholders[1]
     subtitle.text = "This layout is great for dividing your presentation into sections"
     
-    print("✓ Created Slide 3: Section Header")
+    log("✓ Created Slide 3: Section Header")
     
     # ========== Slide 4: Two Content ==========
     slide_layout = prs.slide_layouts[3]  # Two Content layout
@@ -84,27 +135,23 @@ def create_presentation():
     
     # Left content
     left_content = slide.placeholders[1]
-    tf = left_content.text_frame
-    tf.text = "Left Column Content"
-    p = tf.add_paragraph()
-    p.text = "Placeholder bullet 1"
-    p = tf.add_paragraph()
-    p.text = "Placeholder bullet 2"
-    p = tf.add_paragraph()
-    p.text = "Placeholder bullet 3"
+    set_bullets(left_content.text_frame, [
+        "Left Column Content",
+        "Placeholder bullet 1",
+        "Placeholder bullet 2",
+        "Placeholder bullet 3",
+    ])
     
     # Right content
     right_content = slide.placeholders[2]
-    tf = right_content.text_frame
-    tf.text = "Right Column Content"
-    p = tf.add_paragraph()
-    p.text = "Placeholder item A"
-    p = tf.add_paragraph()
-    p.text = "Placeholder item B"
-    p = tf.add_paragraph()
-    p.text = "Placeholder item C"
+    set_bullets(right_content.text_frame, [
+        "Right Column Content",
+        "Placeholder item A",
+        "Placeholder item B",
+        "Placeholder item C",
+    ])
     
-    print("✓ Created Slide 4: Two Content")
+    log("✓ Created Slide 4: Two Content")
     
     # ========== Slide 5: Comparison ==========
     slide_layout = prs.slide_layouts[4]  # Comparison layout
@@ -120,7 +167,7 @@ def create_presentation():
         elif shape.placeholder_format.idx == 2:
             shape.text = "Option B\n• Feature X\n• Feature Y\n• Feature Z"
     
-    print("✓ Created Slide 5: Comparison")
+    log("✓ Created Slide 5: Comparison")
     
     # ========== Slide 6: Title Only ==========
     slide_layout = prs.slide_layouts[5]  # Title Only layout
@@ -144,7 +191,7 @@ def create_presentation():
     p.font.size = Pt(24)
     p.alignment = PP_ALIGN.CENTER
     
-    print("✓ Created Slide 6: Title Only")
+    log("✓ Created Slide 6: Title Only")
     
     # ========== Slide 7: Blank Layout ==========
     slide_layout = prs.slide_layouts[6]  # Blank layout
@@ -162,7 +209,7 @@ def create_presentation():
     p = tf.paragraphs[0]
     p.font.size = Pt(32)
     p.font.bold = True
-    p.font.color.rgb = RGBColor(0, 51, 102)
+    p.font.color.rgb = NAVY
     
     # Add some content
     left = Inches(1)
@@ -172,15 +219,18 @@ def create_presentation():
     
     content_box = slide.shapes.add_textbox(left, top, width, height)
     tf = content_box.text_frame
-    tf.text = "This is a blank layout where you have full control.\n\n"
-    tf.text += "You can add:\n"
-    tf.text += "• Text boxes (like this one)\n"
-    tf.text += "• Shapes (rectangles, circles, etc.)\n"
-    tf.text += "• Images (placeholder images)\n"
-    tf.text += "• Charts and tables\n"
-    tf.text += "• And position them anywhere!"
-    
-    print("✓ Created Slide 7: Blank Layout")
+    tf.text = "\n".join([
+        "This is a blank layout where you have full control.",
+        "",
+        "You can add:",
+        "• Text boxes (like this one)",
+        "• Shapes (rectangles, circles, etc.)",
+        "• Images (placeholder images)",
+        "• Charts and tables",
+        "• And position them anywhere!",
+    ])
+    
+    log("✓ Created Slide 7: Blank Layout")
     
     # ========== Slide 8: Custom Shapes Demo ==========
     slide_layout = prs.slide_layouts[5]  # Title Only
@@ -190,58 +240,22 @@ def create_presentation():
     title.text = "Custom Shapes and Formatting"
     
     # Add rectangles with different colors
-    from pptx.enum.shapes import MSO_SHAPE
-    
     left = Inches(1)
     top = Inches(2)
     width = Inches(2)
     height = Inches(1.5)
     
-    # Blue rectangle
-    shape1 = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE, left, top, width, height
-    )
-    shape1.fill.solid()
-    shape1.fill.fore_color.rgb = RGBColor(0, 112, 192)
-    shape1.text_frame.text = "Placeholder\nBox 1"
-    shape1.text_frame.paragraphs[0].font.color.rgb = RGBColor(255, 255, 255)
-    shape1.text_frame.paragraphs[0].font.size = Pt(18)
-    shape1.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
-    
-    # Green rectangle
-    shape2 = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE, left + Inches(2.5), top, width, height
-    )
-    shape2.fill.solid()
-    shape2.fill.fore_color.rgb = RGBColor(0, 176, 80)
-    shape2.text_frame.text = "Placeholder\nBox 2"
-    shape2.text_frame.paragraphs[0].font.color.rgb = RGBColor(255, 255, 255)
-    shape2.text_frame.paragraphs[0].font.size = Pt(18)
-    shape2.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
-    
-    # Orange rectangle
-    shape3 = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE, left + Inches(5), top, width, height
-    )
-    shape3.fill.solid()
-    shape3.fill.fore_color.rgb = RGBColor(255, 127, 39)
-    shape3.text_frame.text = "Placeholder\nBox 3"
-    shape3.text_frame.paragraphs[0].font.color.rgb = RGBColor(255, 255, 255)
-    shape3.text_frame.paragraphs[0].font.size = Pt(18)
-    shape3.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
+    for rgb, text, dx in BOXES:
+        _add_colored_box(slide, left + dx, top, width, height, rgb, text)
     
     # Add a rounded rectangle
-    shape4 = slide.shapes.add_shape(
-        MSO_SHAPE.ROUNDED_RECTANGLE, Inches(2.5), Inches(4), Inches(5), Inches(1)
+    _add_colored_box(
+        slide, Inches(2.5), Inches(4), Inches(5), Inches(1), PURPLE,
+        "Rounded Rectangle - Placeholder for important note",
+        pt=16, shape_type=MSO_SHAPE.ROUNDED_RECTANGLE
     )
-    shape4.fill.solid()
-    shape4.fill.fore_color.rgb = RGBColor(128, 0, 128)
-    shape4.text_frame.text = "Rounded Rectangle - Placeholder for important note"
-    shape4.text_frame.paragraphs[0].font.color.rgb = RGBColor(255, 255, 255)
-    shape4.text_frame.paragraphs[0].font.size = Pt(16)
-    shape4.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
     
-    print("✓ Created Slide 8: Custom Shapes")
+    log("✓ Created Slide 8: Custom Shapes")
     
     # ========== Slide 9: Picture Placeholder Demo ==========
     slide_layout = prs.slide_layouts[5]  # Title Only
@@ -261,14 +275,14 @@ def create_presentation():
             MSO_SHAPE.RECTANGLE, left, top, width, height
         )
         shape.fill.solid()
-        shape.fill.fore_color.rgb = RGBColor(220, 220, 220)
-        shape.line.color.rgb = RGBColor(150, 150, 150)
+        shape.fill.fore_color.rgb = GREY_FILL
+        shape.line.color.rgb = GREY_LINE
         shape.text_frame.text = f"[Image Placeholder {i}]\n\nYou can insert images here\nusing add_picture()"
         shape.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
         shape.text_frame.paragraphs[0].font.size = Pt(14)
-        shape.text_frame.paragraphs[0].font.color.rgb = RGBColor(100, 100, 100)
+        shape.text_frame.paragraphs[0].font.color.rgb = GREY_TEXT
     
-    print("✓ Created Slide 9: Picture Placeholders")
+    log("✓ Created Slide 9: Picture Placeholders")
     
     # ========== Slide 10: Summary ==========
     slide_layout = prs.slide_layouts[1]  # Title and Content
@@ -278,8 +292,6 @@ def create_presentation():
     title.text = "Python-PPTX Capabilities Summary"
     
     content = slide.placeholders[1]
-    tf = content.text_frame
-    tf.text = "What we've explored:"
     
     capabilities = [
         "Multiple built-in slide layouts (Title, Content, Section Header, etc.)",
@@ -292,18 +304,15 @@ def create_presentation():
         "Full layout customization on blank slides"
     ]
     
-    for capability in capabilities:
-        p = tf.add_paragraph()
-        p.text = capability
-        p.level = 0
+    set_bullets(content.text_frame, ["What we've explored:"] + capabilities)
     
-    print("✓ Created Slide 10: Summary")
+    log("✓ Created Slide 10: Summary")
     
     # Save the presentation
     filename = "python_pptx_template_demo.pptx"
     prs.save(filename)
-    print(f"\n✅ Presentation saved as '{filename}'")
-    print(f"   Total slides created: {len(prs.slides)}")
+    log(f"\n✅ Presentation saved as '{filename}'")
+    log(f"   Total slides created: {len(prs.slides)}")
     
     return filename
 
@@ -2,12 +2,12 @@ from pptx import Presentation
 
 # Load presentation
 prs = Presentation('output.pptx')
-for i in range(0,len(prs.slides)):
-    slide = prs.slides[i]
+for i, slide in enumerate(prs.slides):
     print("Slide: ",i)
     # Iterate through all placeholders
     for shape in slide.placeholders:
-        print(f"Placeholder idx: {shape.placeholder_format.idx}")
-        print(f"Type: {shape.placeholder_format.type}")
+        pf = shape.placeholder_format
+        print(f"Placeholder idx: {pf.idx}")
+        print(f"Type: {pf.type}")
         print(f"Name: {shape.name}")
-        print("---")
\ No newline at end of file
+        print("---")
@@ -1,36 +1,100 @@
+import asyncio
 import os
+import functools
 import json
+import logging
 import google.generativeai as genai
 from django.conf import settings
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # optional: stdlib json gives the same results, just slower
+    _json_loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+
+def _describe_placeholder(p):
+    types = ["Text"]
+    if p.get('is_image'): types.append("Image")
+    if p.get('is_table'): types.append("Table")
+    if p.get('is_chart'): types.append("Chart")
+    return f"{p['index']} ({p['name']}, supports: {', '.join(types)})"
+
+
+def _compact_schema(placeholders):
+    """One `index:name [kinds]` entry per placeholder; far fewer tokens than JSON."""
+    entries = []
+    for p in placeholders:
+        kinds = [k for k in ("title", "image", "table", "chart") if p.get(f"is_{k}")]
+        entries.append(f"{p['index']}:{p['name']} [{','.join(['text'] + kinds)}]")
+    return "; ".join(entries)
+
+
+def _describe_layouts(layouts):
+    """Schema description of each layout and what its placeholders support."""
+    return "\n".join(
+        f"Layout ID {l['id']} ({l['name']}): [{', '.join(_describe_placeholder(p) for p in l['placeholders'])}]"
+        for l in layouts
+    )
+
+
+def _format_layouts_for_prompt(layouts):
+    # layout is dict from TemplateManager.analyze_template
+    # l['name'], l['placeholders'], l['id']
+    return "\n".join(
+        f"ID {l['id']}: {l['name']} (Slots: {', '.join(p['name'] for p in l['placeholders'])})"
+        for l in layouts
+    )
+
+
+class _TemplateLayouts:
+    """Layouts of one template, hashed by template fingerprint so derived text can be cached."""
+    __slots__ = ("key", "layouts")
+
+    def __init__(self, key, layouts):
+        self.key = key
+        self.layouts = layouts
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __eq__(self, other):
+        return isinstance(other, _TemplateLayouts) and self.key == other.key
+
+
+@functools.lru_cache(maxsize=32)
+def _memoized_layouts_prompt(formatter, template_layouts):
+    return formatter(template_layouts.layouts)
+
+
 class GeminiService:
     def __init__(self):
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key:
-            print("Warning: GEMINI_API_KEY not set.")
+            logger.warning("GEMINI_API_KEY not set.")
             self.model = None
         else:
             genai.configure(api_key=api_key)
             self.model = genai.GenerativeModel('gemini-2.5-flash')
 
-    def generate_full_presentation(self, topic, grade_level, duration, available_layouts):
+    def generate_full_presentation(self, topic, grade_level, duration, available_layouts, layouts_key=None):
         """
         Generates the ENTIRE presentation (Outline + Content) in a single API call.
+        This is the default generation path: one request instead of 1 outline + N slide calls.
+        layouts_key: optional template fingerprint used to cache the layout description.
         """
-        # Build a schema description for the AI
-        layouts_desc = []
-        for l in available_layouts:
-            ph_info = []
-            for p in l['placeholders']:
-                types = ["Text"]
-                if p.get('is_image'): types.append("Image")
-                if p.get('is_table'): types.append("Table")
-                if p.get('is_chart'): types.append("Chart")
-                ph_info.append(f"{p['index']} ({p['name']}, supports: {', '.join(types)})")
-            
-            layouts_desc.append(f"Layout ID {l['id']} ({l['name']}): [{', '.join(ph_info)}]")
-            
-        layouts_prompt = "\n".join(layouts_desc)
+        prompt = self._full_presentation_prompt(topic, grade_level, duration, available_layouts, layouts_key)
+        return self._call_gemini_json(prompt)
+
+    async def generate_full_presentation_async(self, topic, grade_level, duration, available_layouts, layouts_key=None):
+        """Async variant of generate_full_presentation, for ASGI callers."""
+        prompt = self._full_presentation_prompt(topic, grade_level, duration, available_layouts, layouts_key)
+        return await self._call_gemini_json_async(prompt)
+
+    def _full_presentation_prompt(self, topic, grade_level, duration, available_layouts, layouts_key=None):
+        layouts_prompt = self._layouts_prompt(_describe_layouts, available_layouts, layouts_key)
         
         prompt = f"""
         Act as an expert teacher. Create a complete lesson presentation plan and content on "{topic}" for Grade {grade_level}.
@@ -73,17 +137,18 @@ class GeminiService:
             ]
         }}
         """
-        return self._call_gemini_json(prompt)
+        return prompt
 
-    def generate_lesson_outline(self, topic, grade_level, duration, available_layouts):
+    def generate_lesson_outline(self, topic, grade_level, duration, available_layouts, layouts_key=None):
         """
         Generates a sequence of slides with selected layouts.
         """
+        layouts_prompt = self._layouts_prompt(_format_layouts_for_prompt, available_layouts, layouts_key)
         prompt = f"""
         Act as an expert curriculum planner. Create a {duration}-minute lesson plan on "{topic}" for Grade {grade_level}.
         
         Available Slide Layouts (ID: Name - Description):
-        {self._format_layouts_for_prompt(available_layouts)}
+        {layouts_prompt}
         
         Output a JSON array of objects. Each object represents a slide and must have:
         - "slide_number": int
@@ -102,8 +167,29 @@ class GeminiService:
     def generate_slide_content(self, slide_title, slide_purpose, layout_schema, grade_level):
         """
         Generates specific text content for a slide's placeholders.
+        Only used to regenerate a single slide; full decks come from generate_full_presentation.
         """
-        prompt = f"""
+        prompt = self._slide_content_prompt(slide_title, slide_purpose, layout_schema, grade_level)
+        return self._call_gemini_json(prompt)
+
+    async def generate_slide_content_async(self, slide_title, slide_purpose, layout_schema, grade_level):
+        """Async variant of generate_slide_content, for ASGI callers."""
+        prompt = self._slide_content_prompt(slide_title, slide_purpose, layout_schema, grade_level)
+        return await self._call_gemini_json_async(prompt)
+
+    async def generate_slides_content_async(self, slides, grade_level):
+        """
+        Generates content for several slides concurrently.
+        slides: list of (slide_title, slide_purpose, layout_schema) tuples.
+        Returns the contents in the same order.
+        """
+        return await asyncio.gather(*(
+            self.generate_slide_content_async(title, purpose, schema, grade_level)
+            for title, purpose, schema in slides
+        ))
+
+    def _slide_content_prompt(self, slide_title, slide_purpose, layout_schema, grade_level):
+        return f"""
         Write the content for a presentation slide.
         Topic: {slide_title}
         Purpose: {slide_purpose}
@@ -111,8 +197,8 @@ class GeminiService:
         
         The slide uses a layout with specific placeholders. You must provide content for each relevant placeholder.
         
-        Placeholders Schema:
-        {json.dumps(layout_schema, indent=2)}
+        Placeholders Schema (index:name [content kinds it accepts]):
+        {_compact_schema(layout_schema)}
         
         Instructions:
         1. Return a JSON object where keys are the Placeholder Indices (as strings) and values are the text content.
@@ -127,21 +213,19 @@ class GeminiService:
         
         Output purely JSON.
         """
-        
-        return self._call_gemini_json(prompt)
 
-    def _format_layouts_for_prompt(self, layouts):
-        lines = []
-        for l in layouts:
-            # layout is dict from TemplateManager.analyze_template
-            # l['name'], l['placeholders'], l['id']
-            ph_names = [p['name'] for p in l['placeholders']]
-            lines.append(f"ID {l['id']}: {l['name']} (Slots: {', '.join(ph_names)})")
-        return "\n".join(lines)
+    def _layouts_prompt(self, formatter, layouts, layouts_key=None):
+        """
+        Prompt text for `layouts`. When `layouts_key` (the template fingerprint) is
+        given, the text is built once per template and reused across requests.
+        """
+        if layouts_key is None:
+            return formatter(layouts)
+        return _memoized_layouts_prompt(formatter, _TemplateLayouts(layouts_key, layouts))
 
     def _call_gemini_json(self, prompt):
         if self.model is None:
-            print("Gemini Error: API key not configured")
+            logger.error("Gemini Error: API key not configured")
             return None
             
         try:
@@ -151,10 +235,29 @@ class GeminiService:
                 prompt,
                 generation_config={'response_mime_type': 'application/json'}
             )
-            print('--------------')
-            print(response)
-            return json.loads(response.text)
+            return self._parse_response(response)
         except Exception as e:
-            print(f"Gemini Error: {e}")
+            logger.exception("Gemini Error: %s", e)
             # Mock fallback for dev/testing if API fails
             return None
+
+    async def _call_gemini_json_async(self, prompt):
+        """Same as _call_gemini_json, but doesn't block the event loop while waiting."""
+        if self.model is None:
+            logger.error("Gemini Error: API key not configured")
+            return None
+            
+        try:
+            response = await self.model.generate_content_async(
+                prompt,
+                generation_config={'response_mime_type': 'application/json'}
+            )
+            return self._parse_response(response)
+        except Exception as e:
+            logger.exception("Gemini Error: %s", e)
+            return None
+
+    def _parse_response(self, response):
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Gemini response: %s", response.text[:500])
+        return _json_loads(response.text)
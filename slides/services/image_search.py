@@ -2,9 +2,70 @@
 Google Image Search Service
 Converts AI-generated image queries into actual image URLs using Google Custom Search API
 """
+import hashlib
 import os
+import threading
+import time
 import requests
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Optional, List, Dict
+from django.conf import settings
+
+try:
+    import diskcache
+except ImportError:  # optional: without it only the in-process cache is used
+    diskcache = None
+
+# Best-image lookups are cached per normalized query: in memory (LRU) and, when
+# diskcache is installed, on disk so results survive restarts and save API quota.
+CACHE_TTL = 30 * 24 * 3600
+MEMORY_CACHE_SIZE = 4096
+_MISS = object()
+_memory_cache = OrderedDict()  # query -> (url, fetched_at)
+_memory_lock = threading.Lock()
+_disk_cache = None
+
+
+def _get_disk_cache():
+    global _disk_cache
+    if _disk_cache is None and diskcache is not None:
+        _disk_cache = diskcache.Cache(os.path.join(settings.BASE_DIR, '.cache', 'images'))
+    return _disk_cache
+
+
+def _cache_get(key):
+    """Return the cached URL (possibly None) for `key`, or _MISS."""
+    with _memory_lock:
+        entry = _memory_cache.get(key)
+        if entry is not None:
+            _memory_cache.move_to_end(key)
+    if entry is None:
+        disk = _get_disk_cache()
+        entry = disk.get(key) if disk is not None else None
+    if entry is None or time.time() - entry[1] > CACHE_TTL:
+        return _MISS
+    _remember(key, entry)
+    return entry[0]
+
+
+def _cache_set(key, url):
+    entry = (url, time.time())
+    _remember(key, entry)
+    disk = _get_disk_cache()
+    if disk is not None:
+        disk.set(key, entry, expire=CACHE_TTL)
+
+
+def _remember(key, entry):
+    with _memory_lock:
+        _memory_cache[key] = entry
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+
 
 class ImageSearchService:
     def __init__(self):
@@ -12,6 +73,12 @@ class ImageSearchService:
         self.search_engine_id = os.getenv("GOOGLE_SEARCH_ENGINE_ID")
         self.base_url = "https://www.googleapis.com/customsearch/v1"
         
+        # One pooled session so repeated/batched searches reuse the TLS connection,
+        # retrying rate-limit and transient server errors with a short backoff
+        retries = Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=retries))
+        
         if not self.api_key or not self.search_engine_id:
             print("Warning: Google Search API credentials not configured")
             print("Set GOOGLE_SEARCH_API_KEY and GOOGLE_SEARCH_ENGINE_ID in .env")
@@ -32,35 +99,7 @@ class ImageSearchService:
             return self._get_placeholder_images(query, num_results)
         
         try:
-            params = {
-                'key': self.api_key,
-                'cx': self.search_engine_id,
-                'q': query,
-                'searchType': 'image',
-                'num': min(num_results, 10),
-                'safe': 'active',  # Safe search for educational content
-                'imgSize': 'large',
-                'fileType': 'jpg|png',
-                'rights': 'cc_publicdomain|cc_attribute|cc_sharealike'  # Filter for usable images to avoid Access Denied errors
-            }
-            
-            response = requests.get(self.base_url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            results = []
-            for item in data.get('items', []):
-                results.append({
-                    'url': item.get('link'),
-                    'title': item.get('title'),
-                    'thumbnail': item.get('image', {}).get('thumbnailLink'),
-                    'width': item.get('image', {}).get('width'),
-                    'height': item.get('image', {}).get('height')
-                })
-            
-            return results
-            
+            return self._fetch_images(query, num_results)
         except requests.exceptions.RequestException as e:
             print(f"Image search failed: {e}")
             return self._get_placeholder_images(query, num_results)
@@ -68,6 +107,37 @@ class ImageSearchService:
             print(f"Unexpected error in image search: {e}")
             return self._get_placeholder_images(query, num_results)
     
+    def _fetch_images(self, query: str, num_results: int) -> List[Dict[str, str]]:
+        """Query the Custom Search API. Raises on any request/response error."""
+        params = (
+            ('key', self.api_key),
+            ('cx', self.search_engine_id),
+            ('q', query),
+            ('searchType', 'image'),
+            ('num', min(num_results, 10)),
+            ('safe', 'active'),  # Safe search for educational content
+            ('imgSize', 'large'),
+            ('fileType', 'jpg|png'),
+            ('rights', 'cc_publicdomain|cc_attribute|cc_sharealike'),  # Filter for usable images to avoid Access Denied errors
+        )
+        
+        response = self._session.get(self.base_url, params=params, timeout=10)
+        response.raise_for_status()
+        
+        data = response.json()
+        
+        results = []
+        for item in data.get('items', []):
+            results.append({
+                'url': item.get('link'),
+                'title': item.get('title'),
+                'thumbnail': item.get('image', {}).get('thumbnailLink'),
+                'width': item.get('image', {}).get('width'),
+                'height': item.get('image', {}).get('height')
+            })
+        
+        return results
+    
     def get_best_image(self, query: str) -> Optional[str]:
         """
         Get the best (first) image URL for a query
@@ -78,27 +148,70 @@ class ImageSearchService:
         Returns:
             Image URL or None
         """
-        results = self.search_images(query, num_results=1)
-        if results and len(results) > 0:
-            return results[0].get('url')
-        return None
+        if not self.api_key or not self.search_engine_id:
+            # Placeholder URLs are computed locally, nothing to cache
+            return self._get_placeholder_images(query, 1)[0].get('url')
+        
+        key = query.strip().lower()
+        url = _cache_get(key)
+        if url is not _MISS:
+            return url
+        
+        try:
+            results = self._fetch_images(query, num_results=1)
+        except Exception as e:
+            # Don't cache failures, only real (possibly empty) API answers
+            print(f"Image search failed: {e}")
+            return self._get_placeholder_images(query, 1)[0].get('url')
+        
+        url = results[0].get('url') if results else None
+        _cache_set(key, url)
+        return url
     
     def _get_placeholder_images(self, query: str, num_results: int) -> List[Dict[str, str]]:
         """
         Return placeholder image data when API is not available
         Uses placeholder image services
         """
-        placeholders = []
-        for i in range(num_results):
-            # Using picsum.photos as a fallback placeholder service
-            placeholders.append({
-                'url': f'https://picsum.photos/800/600?random={hash(query) + i}',
+        # Stable across processes (unlike hash(), which is salted per interpreter),
+        # so the same query always maps to the same URLs and downstream caches hit
+        seed = int(hashlib.blake2b(query.encode(), digest_size=4).hexdigest(), 16)
+        # Using picsum.photos as a fallback placeholder service
+        return [
+            {
+                'url': f'https://picsum.photos/800/600?random={seed + i}',
                 'title': f'Placeholder for: {query}',
-                'thumbnail': f'https://picsum.photos/200/150?random={hash(query) + i}',
+                'thumbnail': f'https://picsum.photos/200/150?random={seed + i}',
                 'width': 800,
                 'height': 600
-            })
-        return placeholders
+            }
+            for i in range(num_results)
+        ]
+    
+    def get_best_images(self, queries: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Get the best image URL for many queries in one call
+        
+        Queries that only differ in case/whitespace share one lookup, and the
+        lookups run concurrently.
+        
+        Args:
+            queries: Search query strings (duplicates are fine)
+            
+        Returns:
+            Dict mapping every given query to its image URL or None
+        """
+        # normalized query -> the first spelling seen, which is the one searched for
+        unique = {}
+        for query in queries:
+            unique.setdefault(query.strip().lower(), query)
+        if not unique:
+            return {}
+        
+        # Searches are network-bound, so run them concurrently
+        with ThreadPoolExecutor(max_workers=min(8, len(unique))) as executor:
+            urls = dict(zip(unique, executor.map(self.get_best_image, unique.values())))
+        return {query: urls[query.strip().lower()] for query in queries}
     
     def batch_search(self, queries: List[str]) -> Dict[str, str]:
         """
@@ -110,9 +223,4 @@ class ImageSearchService:
         Returns:
             Dict mapping query to best image URL
         """
-        results = {}
-        for query in queries:
-            url = self.get_best_image(query)
-            if url:
-                results[query] = url
-        return results
+        return {query: url for query, url in self.get_best_images(queries).items() if url}
@@ -0,0 +1,70 @@
+"""
+python-pptx speed patches
+Importing this module patches python-pptx in place; it is safe to import more than once.
+
+- Package.next_partname / next_image_partname walk every part in the package on each
+  call, which makes adding N charts or images O(N^2). The next free number is now
+  computed once per package and template and then just incremented. Numbering is
+  therefore max+1, where python-pptx would fill the first gap left by a dropped part,
+  so gaps in the template's numbering are not reused.
+- Saving deflates every part at zlib's default level 6. XML/rels parts are written at
+  level 1 (about half the CPU, slightly larger file) and already-compressed media is
+  stored as-is.
+"""
+import os
+import re
+import zipfile
+
+from pptx.opc.package import OpcPackage
+from pptx.opc.packuri import PackURI
+from pptx.opc.serialized import _ZipPkgWriter
+from pptx.package import Package
+
+_IMAGE_TMPL = "/ppt/media/image%d.%s"
+_DIGITS_RE = re.compile(r"\d+")
+
+
+def _next_idx(package, tmpl, prefix):
+    """Return the next free partname number for `tmpl`, scanning the package only once."""
+    counters = package.__dict__.setdefault("_next_idx_by_tmpl", {})
+    idx = counters.get(tmpl)
+    if idx is None:
+        # Read the number straight after the prefix; PackURI.idx is None for names like
+        # Microsoft_Excel_Sheet1.xlsx, which would restart the count and reuse a partname
+        used = [0]
+        for part in package.iter_parts():
+            partname = part.partname
+            if partname.startswith(prefix):
+                m = _DIGITS_RE.match(partname, len(prefix))
+                if m:
+                    used.append(int(m.group()))
+        idx = max(used) + 1
+    counters[tmpl] = idx + 1
+    return idx
+
+
+def _next_partname(self, tmpl):
+    prefix = tmpl[: tmpl.index("%d")]
+    return PackURI(tmpl % _next_idx(self, tmpl, prefix))
+
+
+def _next_image_partname(self, ext):
+    return PackURI(_IMAGE_TMPL % (_next_idx(self, _IMAGE_TMPL, "/ppt/media/image"), ext))
+
+
+_STORED_EXTS = {".png", ".jpg", ".jpeg", ".gif", ".mp4", ".m4v", ".mov"}
+
+
+def _write_part(self, pack_uri, blob):
+    """Write `blob` with per-part compression instead of zipfile's default."""
+    if os.path.splitext(pack_uri.membername)[1].lower() in _STORED_EXTS:
+        self._zipf.writestr(pack_uri.membername, blob, compress_type=zipfile.ZIP_STORED)
+    else:
+        self._zipf.writestr(pack_uri.membername, blob, compresslevel=1)
+
+
+if not getattr(OpcPackage, "_fastpatched", False):
+    OpcPackage.next_partname = _next_partname
+    Package.next_image_partname = _next_image_partname
+    _ZipPkgWriter.write = _write_part
+    OpcPackage._fastpatched = True
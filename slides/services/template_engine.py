@@ -1,13 +1,66 @@
 import os
-import requests
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
-from PIL import Image
 from pptx import Presentation
 from pptx.util import Inches, Pt
 from pptx.enum.shapes import PP_PLACEHOLDER
-from pptx.chart.data import CategoryChartData
-from pptx.enum.chart import XL_CHART_TYPE
 from django.conf import settings
+from . import pptx_fastpatch  # noqa: F401 (patches python-pptx on import)
+
+# Leading bytes of image formats PowerPoint accepts as-is: PNG, JPEG, GIF, BMP
+_SUPPORTED_MAGIC = (b'\x89PNG', b'\xff\xd8\xff', b'GIF8', b'BM')
+
+# Font size by text length: the first step whose threshold the length exceeds wins
+_FONT_STEPS = ((300, Pt(12)), (200, Pt(14)), (100, Pt(18)), (-1, Pt(24)))
+
+# Downloaded images are cached on disk by URL (when requests-cache is installed),
+# so images shared between slides or repeated builds are only fetched once.
+IMAGE_CACHE_TTL = 24 * 3600
+# Largest Content-Length the download buffer is preallocated for
+_MAX_PREALLOC = 32 * 1024 * 1024
+_image_session = None
+_image_session_lock = threading.Lock()
+
+
+def _get_image_session():
+    # requests (and requests-cache) are imported here, on the first image download,
+    # rather than when Django loads the views
+    global _image_session
+    with _image_session_lock:
+        if _image_session is not None:
+            return _image_session
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        try:
+            import requests_cache
+        except ImportError:  # optional: without it every build downloads its images again
+            requests_cache = None
+            
+        if requests_cache is not None:
+            _image_session = requests_cache.CachedSession(
+                cache_name=os.path.join(settings.BASE_DIR, '.cache', 'http'),
+                backend='sqlite',
+                expire_after=IMAGE_CACHE_TTL,
+                allowable_methods=('GET',),
+                # Cache 404s too, so dead links are not retried on every build
+                allowable_codes=(200, 404),
+            )
+        else:
+            _image_session = requests.Session()
+        # Keep-alive connection pool sized for the prefetch thread pool
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16,
+                              max_retries=Retry(total=2, backoff_factor=0.2))
+        _image_session.mount('https://', adapter)
+        _image_session.mount('http://', adapter)
+        # Browser User-Agent to avoid 403 Forbidden from sites like Wikimedia
+        _image_session.headers['User-Agent'] = (
+            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        )
+        return _image_session
+
 
 class TemplateManager:
     """
@@ -15,15 +68,32 @@ class TemplateManager:
     """
     
     def __init__(self, template_path):
-        if not os.path.exists(template_path):
-            raise FileNotFoundError(f"Template not found: {template_path}")
         self.template_path = template_path
-        self.prs = Presentation(template_path)
+        # Read the file once (raises FileNotFoundError if missing); every generated
+        # presentation is loaded from these bytes
+        with open(template_path, 'rb') as f:
+            # Identifies this version of the template (e.g. for caching derived prompt text)
+            self.fingerprint = (template_path, os.fstat(f.fileno()).st_mtime)
+            self._template_bytes = f.read()
+        self.prs = Presentation(BytesIO(self._template_bytes))
+        self._layouts_info = None
+        # layout_id -> {"by_type": {category: [placeholder idx]}, "all_idx": frozenset}
+        self._layout_ph_categories = {}
+        # Content "type" -> handler(shape, value, images) for dict values in _fill_shape
+        self._dispatch = {
+            "image": self._insert_image_value,
+            "table": lambda shape, value, images: self._insert_table(shape, value),
+            "chart": lambda shape, value, images: self._insert_chart(shape, value)
+        }
 
     def analyze_template(self):
         """
         Returns a JSON-serializable structure defining available layouts and their placeholders.
+        The result is computed once per instance (self.prs is never modified); treat it as read-only.
         """
+        if self._layouts_info is not None:
+            return self._layouts_info
+            
         layouts_info = []
         
         for idx, layout in enumerate(self.prs.slide_layouts):
@@ -51,26 +121,37 @@ class TemplateManager:
                 "placeholders": placeholders
             })
             
-        return {"layouts": layouts_info}
+        self._layouts_info = {"layouts": layouts_info}
+        return self._layouts_info
 
-    def create_presentation(self, slides_data, output_filename=None):
+    def create_presentation(self, slides_data, output_filename=None, output_stream=None):
         """
         Creates a new presentation based on the template and provided data.
         
         slides_data: List of dictionaries. Each dict should have:
             - layout_id: int (index of the layout to use)
             - content: dict mapping placeholder_index (str/int) to value
+        output_stream: Optional file-like object. If given, the presentation is written
+            there instead of to MEDIA_ROOT (e.g. a BytesIO for an HTTP response).
             
-        Returns: Path to the saved file.
+        Returns: Path to the saved file, or output_stream if one was given.
         """
         # Create a fresh presentation instance from the template
-        new_prs = Presentation(self.template_path)
+        new_prs = Presentation(BytesIO(self._template_bytes))
         
         # Remove any existing slides (templates sometimes have dummy slides)
         # Note: python-pptx doesn't support deleting common slides easily without low-level XML, 
         # but usually we just append. If the template file comes with slides, they remain.
         # Ideally, the template file should be empty of slides, just masters/layouts.
         
+        # Download all images up front and in parallel rather than one by one while filling slides
+        images = self._prefetch_images(slides_data)
+        
+        # Slides themselves are built on this thread only. python-pptx objects are not
+        # thread-safe, and merging slides built in other processes would mean re-linking
+        # every part (images, charts, layouts) by hand. The slow part, network I/O, is
+        # already parallel above.
+        
         for slide_data in slides_data:
             layout_id = slide_data.get("layout_id")
             content = slide_data.get("content", {})
@@ -85,7 +166,11 @@ class TemplateManager:
                 continue
                 
             slide = new_prs.slides.add_slide(slide_layout)
-            self._fill_slide(slide, content)
+            self._fill_slide(slide, layout_id, content, images)
+            
+        if output_stream is not None:
+            new_prs.save(output_stream)
+            return output_stream
             
         if not output_filename:
             output_filename = "generated_lesson.pptx"
@@ -95,13 +180,15 @@ class TemplateManager:
         
         return output_path
 
-    def _fill_slide(self, slide, content_map):
+    def _layout_categories(self, layout_id, slide):
         """
-        Fills a single slide's placeholders with content.
-        Includes robust fallback logic (fuzzy matching) if AI provides wrong indices.
+        Placeholder indices of a layout grouped by category. Categorization only depends on
+        the layout, so it is computed from the first slide using it and reused afterwards.
         """
-        # 1. Map available placeholders by index and by type
-        available_phs = {} # index -> shape
+        categories = self._layout_ph_categories.get(layout_id)
+        if categories is not None:
+            return categories
+            
         by_type = {
             "title": [],
             "image": [],
@@ -114,34 +201,57 @@ class TemplateManager:
             ph_idx = ph.placeholder_format.idx
             ph_type = ph.placeholder_format.type
             ph_name = ph.name.lower()
-            available_phs[ph_idx] = ph
             
             # Categorize
             if ph_type == PP_PLACEHOLDER.TITLE or "title" in ph_name:
-                by_type["title"].append(ph)
+                by_type["title"].append(ph_idx)
             elif ph_type in [PP_PLACEHOLDER.PICTURE, PP_PLACEHOLDER.BITMAP] or "picture" in ph_name:
-                by_type["image"].append(ph)
+                by_type["image"].append(ph_idx)
             elif ph_type == PP_PLACEHOLDER.TABLE or "table" in ph_name:
-                by_type["table"].append(ph)
+                by_type["table"].append(ph_idx)
             elif ph_type == PP_PLACEHOLDER.CHART or "chart" in ph_name:
-                by_type["chart"].append(ph)
+                by_type["chart"].append(ph_idx)
             else:
-                by_type["text"].append(ph)
+                by_type["text"].append(ph_idx)
+                
+        categories = {
+            "by_type": by_type,
+            "all_idx": frozenset(idx for idxs in by_type.values() for idx in idxs)
+        }
+        self._layout_ph_categories[layout_id] = categories
+        return categories
+
+    def _fill_slide(self, slide, layout_id, content_map, images=None):
+        """
+        Fills a single slide's placeholders with content.
+        Includes robust fallback logic (fuzzy matching) if AI provides wrong indices.
+        images: Optional {url: prefetched stream} from _prefetch_images.
+        """
+        # 1. Per-slide working copies of the cached placeholder map for this layout
+        categories = self._layout_categories(layout_id, slide)
+        available_phs = set(categories["all_idx"])
+        by_type = {cat: list(idxs) for cat, idxs in categories["by_type"].items()}
 
         # 2. Process content
         unmatched_content = []
         
         for raw_idx, value in content_map.items():
-            try:
+            # JSON keys are nearly always ints or digit strings; only odd keys take the try path
+            if isinstance(raw_idx, int):
+                look_idx = raw_idx
+            elif isinstance(raw_idx, str) and raw_idx.isdecimal():
                 look_idx = int(raw_idx)
-            except:
-                unmatched_content.append(value)
-                continue
+            else:
+                try:
+                    look_idx = int(raw_idx)
+                except (TypeError, ValueError):
+                    unmatched_content.append(value)
+                    continue
                 
             # Attempt exact match
             if look_idx in available_phs:
-                self._fill_shape(available_phs[look_idx], value)
-                available_phs.pop(look_idx) # Mark as used
+                self._fill_shape(slide.placeholders[look_idx], value, images)
+                available_phs.discard(look_idx) # Mark as used
             else:
                 unmatched_content.append(value)
 
@@ -155,14 +265,14 @@ class TemplateManager:
             
             # Priority 1: Direct type match (if available)
             if by_type[target_type]:
-                ph = by_type[target_type].pop(0)
-                self._fill_shape(ph, value)
+                ph_idx = by_type[target_type].pop(0)
+                self._fill_shape(slide.placeholders[ph_idx], value, images)
             # Priority 2: Try "text" placeholder if it's a string
             elif target_type == "text" and by_type["text"]:
-                ph = by_type["text"].pop(0)
-                self._fill_shape(ph, value)
+                ph_idx = by_type["text"].pop(0)
+                self._fill_shape(slide.placeholders[ph_idx], value, images)
 
-    def _fill_shape(self, shape, value):
+    def _fill_shape(self, shape, value, images=None):
         """Helper to route value to the correct insertion method for a shape."""
         if isinstance(value, str):
             # Text routing
@@ -171,63 +281,108 @@ class TemplateManager:
             shape.text = value
             self._apply_font_scaling(shape, value)
             
-        elif isinstance(value, dict) and value.get("type") == "image":
-            self._insert_image(shape, value.get("url"))
-            
-        elif isinstance(value, dict) and value.get("type") == "table":
-            self._insert_table(shape, value)
-            
-        elif isinstance(value, dict) and value.get("type") == "chart":
-            self._insert_chart(shape, value)
+        elif isinstance(value, dict):
+            handler = self._dispatch.get(value.get("type"))
+            if handler is not None:
+                handler(shape, value, images)
+
+    def _insert_image_value(self, shape, value, images=None):
+        """Inserts an {"type": "image", "url": ...} value, using the prefetched stream if there is one."""
+        url = value.get("url")
+        self._insert_image(shape, (images or {}).get(url, url))
 
     def _apply_font_scaling(self, shape, text):
         """Dynamic Font Scaling logic."""
+        text_frame = shape.text_frame
         try:
             text_len = len(text)
-            if shape.text_frame.paragraphs:
-                p = shape.text_frame.paragraphs[0]
-                if not p.runs: p.add_run()
-                
-                if text_len > 300: font_size = Pt(12)
-                elif text_len > 200: font_size = Pt(14)
-                elif text_len > 100: font_size = Pt(18)
-                else: font_size = Pt(24)
-                
-                for paragraph in shape.text_frame.paragraphs:
-                    for run in paragraph.runs:
-                        run.font.size = font_size
-                        
-            shape.text_frame.word_wrap = True
+            font_size = next(size for threshold, size in _FONT_STEPS if text_len > threshold)
+            
+            # shape.text = value has already created the runs
+            for paragraph in text_frame.paragraphs:
+                for run in paragraph.runs:
+                    run.font.size = font_size
         except Exception as e:
             print(f"Error sizing text: {e}")
+        text_frame.word_wrap = True
 
-    def _insert_image(self, shape, image_url):
+    def _download_image(self, image_url):
         """
-        Inserts an image into a picture placeholder, preserving aspect ratio if possible.
+        Downloads an image into memory, streaming the body straight into a single buffer.
         """
-        # Download image to memory
-        try:
-            # Add User-Agent to avoid 403 Forbidden from sites like Wikimedia
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            response = requests.get(image_url, headers=headers, timeout=10)
+        with _get_image_session().get(image_url, stream=True, timeout=10) as response:
             response.raise_for_status()
+            # Size the buffer up front when the length is known, so it isn't regrown per chunk
+            size = response.headers.get('Content-Length', '')
+            if size.isdigit() and int(size) <= _MAX_PREALLOC:
+                image_stream = BytesIO(bytes(int(size)))
+            else:
+                image_stream = BytesIO()
+            response.raw.decode_content = True
+            shutil.copyfileobj(response.raw, image_stream, 64 * 1024)
+            # Drop any preallocated tail the body didn't fill
+            image_stream.truncate()
+        image_stream.seek(0)
+        return image_stream
+
+    def _prefetch_images(self, slides_data):
+        """
+        Downloads every image URL referenced in slides_data concurrently.
+        Returns {url: stream}; a failed download maps to its exception so _insert_image reports it.
+        """
+        urls = {
+            value.get("url")
+            for slide_data in slides_data
+            for value in slide_data.get("content", {}).values()
+            if isinstance(value, dict) and value.get("type") == "image" and value.get("url")
+        }
+        if not urls:
+            return {}
             
-            # Use Pillow to ensure image is in a supported format (e.g. convert WEBP to PNG)
-            image_stream = BytesIO(response.content)
+        def fetch(url):
             try:
-                img = Image.open(image_stream)
-                # Convert to RGB/RGBA then to PNG if not already a standard format
-                # This fixes the "WEBP" not supported issue in many PPT versions
-                converted_stream = BytesIO()
-                img.save(converted_stream, format='PNG')
-                converted_stream.seek(0)
-                final_stream = converted_stream
-            except Exception as img_err:
-                print(f"Pillow conversion failed, trying raw stream: {img_err}")
-                image_stream.seek(0)
+                return self._download_image(url)
+            except Exception as e:
+                return e
+                
+        # Downloads are network-bound, so run them concurrently
+        with ThreadPoolExecutor(max_workers=min(8, len(urls))) as executor:
+            return dict(zip(urls, executor.map(fetch, urls)))
+
+    def _insert_image(self, shape, image):
+        """
+        Inserts an image into a picture placeholder, preserving aspect ratio if possible.
+        image: URL to download, or an already downloaded stream.
+        """
+        try:
+            if isinstance(image, Exception):
+                # Prefetch of this URL failed
+                raise image
+            image_stream = self._download_image(image) if isinstance(image, str) else image
+            image_stream.seek(0)
+            head = image_stream.read(8)
+            image_stream.seek(0)
+            
+            if head.startswith(_SUPPORTED_MAGIC):
+                # Supported formats are inserted as-is, no decode/re-encode
                 final_stream = image_stream
+            else:
+                # Use Pillow to convert other formats to PNG
+                # This fixes the "WEBP" not supported issue in many PPT versions
+                try:
+                    from PIL import Image
+                    img = Image.open(image_stream)
+                    # Let decoders that support it skip work not needed for a plain RGB image
+                    img.draft('RGB', img.size)
+                    converted_stream = BytesIO()
+                    # Favour encode speed over file size
+                    img.save(converted_stream, format='PNG', optimize=False, compress_level=1)
+                    converted_stream.seek(0)
+                    final_stream = converted_stream
+                except Exception as img_err:
+                    print(f"Pillow conversion failed, trying raw stream: {img_err}")
+                    image_stream.seek(0)
+                    final_stream = image_stream
 
             # If it's a proper placeholder, insert_picture creates a NEW shape and replaces the placeholder
             if hasattr(shape, 'insert_picture'):
@@ -262,18 +417,19 @@ class TemplateManager:
             if hasattr(shape, 'insert_table'):
                 table_frame = shape.insert_table(rows=num_rows, cols=num_cols)
                 table = table_frame.table
+                # Resolve each row's cells once instead of a table.cell(r, c) lookup per value
+                table_cells = [list(row.cells) for row in table.rows]
                 
                 # Fill headers
                 if headers:
-                    for i, h in enumerate(headers):
-                        table.cell(0, i).text = str(h)
+                    for cell, h in zip(table_cells[0], headers):
+                        cell.text = str(h)
                 
-                # Fill rows
+                # Fill rows (values beyond num_cols are dropped)
                 start_row = 1 if headers else 0
-                for r_idx, row_data in enumerate(rows):
-                    for c_idx, val in enumerate(row_data):
-                        if c_idx < num_cols:
-                            table.cell(r_idx + start_row, c_idx).text = str(val)
+                for cells, row_data in zip(table_cells[start_row:], rows):
+                    for cell, val in zip(cells, row_data):
+                        cell.text = str(val)
             else:
                 print(f"Shape {shape.name} does not support table insertion.")
                 
@@ -286,6 +442,10 @@ class TemplateManager:
         data: {"chart_type": "...", "categories": ["X", "Y"], "series": [{"name": "S1", "values": [10, 20]}]}
         """
         try:
+            # Chart support is only imported when a deck actually contains a chart
+            from pptx.chart.data import CategoryChartData
+            from pptx.enum.chart import XL_CHART_TYPE
+            
             chart_data = CategoryChartData()
             chart_data.categories = data.get("categories", [])
             
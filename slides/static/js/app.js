@@ -5,7 +5,8 @@ const app = {
         selectedTemplate: null,
         config: {},
         outline: [],
-        slidesContent: []
+        slidesContent: [],
+        downloadUrl: null
     },
 
     init: async () => {
@@ -50,7 +51,7 @@ const app = {
     generateOutline: async () => {
         const topic = document.getElementById('input-topic').value;
         const grade = document.getElementById('input-grade').value;
-        const duration = document.getElementById('input-duration').value || '45 minutes';
+        const duration = document.getElementById('input-duration').value || '45';
 
         if (!topic) return alert('Please enter a topic');
         if (!app.state.selectedTemplate) return alert('Please select a template');
@@ -66,7 +67,7 @@ const app = {
             const res = await fetch('/api/generate/oneshot/', {
                 method: 'POST',
                 body: JSON.stringify({
-                    topic, grade,
+                    topic, grade, duration,
                     template_filename: app.state.selectedTemplate.filename
                 })
             });
@@ -162,21 +163,33 @@ const app = {
 
     buildPresentation: async () => {
         try {
-            const res = await fetch('/api/build/', {
+            // The file comes back in the response body, nothing is written to /media/
+            const res = await fetch('/api/build/direct/', {
                 method: 'POST',
                 body: JSON.stringify({
                     template_filename: app.state.selectedTemplate.filename,
                     slides: app.state.slidesContent
                 })
             });
-            const data = await res.json();
+            if (!res.ok) {
+                const data = await res.json();
+                throw new Error(data.error);
+            }
+            const blob = await res.blob();
 
             document.getElementById('gen-status-text').innerText = 'Done!';
             document.getElementById('gen-status-details').innerText = 'Your lesson is ready.';
 
             document.getElementById('final-actions').classList.remove('hidden');
+            if (app.state.downloadUrl) URL.revokeObjectURL(app.state.downloadUrl);
+            app.state.downloadUrl = URL.createObjectURL(blob);
             const dwBtn = document.getElementById('btn-download');
-            dwBtn.onclick = () => window.location.href = data.download_url;
+            dwBtn.onclick = () => {
+                const link = document.createElement('a');
+                link.href = app.state.downloadUrl;
+                link.download = 'generated_lesson.pptx';
+                link.click();
+            };
 
         } catch (err) {
             alert('Build failed: ' + err.message);
@@ -1,3 +1,39 @@
+import io
+import zipfile
+
 from django.test import TestCase
+from pptx import Presentation
+from pptx.chart.data import CategoryChartData
+from pptx.enum.chart import XL_CHART_TYPE
+from pptx.util import Inches
+
+from slides.services import pptx_fastpatch  # noqa: F401 (patches python-pptx on import)
+
+
+class PptxFastpatchTests(TestCase):
+    def _add_charts(self, prs, count):
+        chart_data = CategoryChartData()
+        chart_data.categories = ['A', 'B']
+        chart_data.add_series('Series 1', (1, 2))
+        for _ in range(count):
+            slide = prs.slides.add_slide(prs.slide_layouts[6])
+            slide.shapes.add_chart(
+                XL_CHART_TYPE.COLUMN_CLUSTERED, Inches(1), Inches(1), Inches(4), Inches(3), chart_data
+            )
+
+    def test_reloaded_deck_gets_new_chart_partnames(self):
+        """Charts added after a reload must not reuse the embedded workbook names"""
+        prs = Presentation()
+        self._add_charts(prs, 3)
+        stream = io.BytesIO()
+        prs.save(stream)
+
+        prs = Presentation(io.BytesIO(stream.getvalue()))
+        self._add_charts(prs, 3)
+        stream = io.BytesIO()
+        prs.save(stream)
 
-# Create your tests here.
+        names = zipfile.ZipFile(stream).namelist()
+        self.assertEqual(len(names), len(set(names)))
+        embeddings = [n for n in names if n.startswith('ppt/embeddings/')]
+        self.assertEqual(len(embeddings), 6)
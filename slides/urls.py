@@ -8,4 +8,5 @@ urlpatterns = [
     path('generate/slide/', views.generate_slide_content, name='generate_slide'),
     path('search/images/', views.search_images, name='search_images'),
     path('build/', views.build_presentation, name='build_presentation'),
+    path('build/direct/', views.build_presentation_direct, name='build_presentation_direct'),
 ]
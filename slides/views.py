@@ -1,5 +1,8 @@
+import functools
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 from django.conf import settings
 from django.http import JsonResponse, HttpResponse
 from django.views.decorators.csrf import csrf_exempt
@@ -11,6 +14,18 @@ from .services.image_search import ImageSearchService
 from django.shortcuts import render
 
 TEMPLATES_DIR = os.path.join(settings.BASE_DIR, 'templates_source')
+PPTX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+@functools.lru_cache(maxsize=32)
+def _get_manager(path, mtime):
+    """
+    One parsed TemplateManager per template file version. `mtime` is part of the key,
+    so editing or replacing a template invalidates its entry.
+    """
+    return TemplateManager(path)
+
+def _template_manager(path):
+    return _get_manager(path, os.path.getmtime(path))
 
 def home(request):
     """
@@ -27,19 +42,30 @@ def list_templates(request):
     if not os.path.exists(TEMPLATES_DIR):
         os.makedirs(TEMPLATES_DIR)
         
+    # DirEntry caches the name and stat, so no extra join/stat per template
+    with os.scandir(TEMPLATES_DIR) as it:
+        entries = [
+            entry for entry in it
+            if entry.name.endswith(".pptx") and not entry.name.startswith("~$")
+        ]
+    
+    def analyze(entry):
+        return _get_manager(entry.path, entry.stat().st_mtime).analyze_template()
+    
+    # Templates not yet in the manager cache are parsed in parallel
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [(entry.name, executor.submit(analyze, entry)) for entry in entries]
+        
     templates = []
-    for f in os.listdir(TEMPLATES_DIR):
-        if f.endswith(".pptx") and not f.startswith("~$"):
-            path = os.path.join(TEMPLATES_DIR, f)
-            try:
-                tm = TemplateManager(path)
-                layout_info = tm.analyze_template()
-                templates.append({
-                    "filename": f,
-                    "layouts": layout_info["layouts"]
-                })
-            except Exception as e:
-                print(f"Error loading {f}: {e}")
+    for f, future in futures:
+        try:
+            layout_info = future.result()
+            templates.append({
+                "filename": f,
+                "layouts": layout_info["layouts"]
+            })
+        except Exception as e:
+            print(f"Error loading {f}: {e}")
                 
     return JsonResponse({"templates": templates})
 
@@ -53,16 +79,17 @@ def generate_one_shot(request):
         data = json.loads(request.body)
         topic = data.get("topic")
         grade = data.get("grade")
+        duration = data.get("duration", "45")
         
         # Get defaults
         template_filename = data.get("template_filename", "modern_template.pptx")
         template_path = os.path.join(TEMPLATES_DIR, template_filename)
         
-        tm = TemplateManager(template_path)
+        tm = _template_manager(template_path)
         layouts = tm.analyze_template().get("layouts", [])
         
         gemini = GeminiService()
-        result = gemini.generate_full_presentation(topic, grade, "45 minutes", layouts)
+        result = gemini.generate_full_presentation(topic, grade, f"{duration} minutes", layouts, layouts_key=tm.fingerprint)
         
         if not result or "slides" not in result:
              return JsonResponse({"error": "Failed to generate presentation"}, status=500)
@@ -86,11 +113,11 @@ def generate_outline(request):
         template_filename = data.get("template_filename")
         
         template_path = os.path.join(TEMPLATES_DIR, template_filename)
-        tm = TemplateManager(template_path)
+        tm = _template_manager(template_path)
         layouts = tm.analyze_template().get("layouts", [])
         
         gemini = GeminiService()
-        outline = gemini.generate_lesson_outline(topic, grade, duration, layouts)
+        outline = gemini.generate_lesson_outline(topic, grade, duration, layouts, layouts_key=tm.fingerprint)
         
         if not outline:
             return JsonResponse({"error": "Failed to generate outline"}, status=500)
@@ -116,7 +143,7 @@ def generate_slide_content(request):
         
         # We need the layout schema to tell Gemini what buckets to fill
         template_path = os.path.join(TEMPLATES_DIR, template_filename)
-        tm = TemplateManager(template_path)
+        tm = _template_manager(template_path)
         layouts = tm.analyze_template().get("layouts", [])
         
         target_layout = next((l for l in layouts if l['id'] == layout_id), None)
@@ -153,6 +180,36 @@ def search_images(request):
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
 
+def _resolve_image_queries(slides_data):
+    """
+    Replace image query objects in the slides' content with actual image URLs (in place).
+    """
+    # Collect every (content, key, query) first so all searches can run in one batch
+    pending = []
+    for slide in slides_data:
+        content = slide.get("content", {})
+        for key, value in content.items():
+            # Check if this is an image query object
+            if isinstance(value, dict) and value.get("type") == "image":
+                query = value.get("query")
+                if query:
+                    pending.append((content, key, query))
+                    
+    if not pending:
+        return
+        
+    image_service = ImageSearchService()
+    urls = image_service.get_best_images([query for _, _, query in pending])
+    
+    for content, key, query in pending:
+        image_url = urls.get(query)
+        if image_url:
+            # Replace the query object with actual image data
+            content[key] = {
+                "type": "image",
+                "url": image_url
+            }
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def build_presentation(request):
@@ -165,27 +222,10 @@ def build_presentation(request):
         template_filename = data.get("template_filename")
         slides_data = data.get("slides", []) # List of {layout_id, content}
         
-        # Process slides to convert image queries to actual URLs
-        image_service = ImageSearchService()
-        
-        for slide in slides_data:
-            content = slide.get("content", {})
-            for key, value in list(content.items()):
-                # Check if this is an image query object
-                if isinstance(value, dict) and value.get("type") == "image":
-                    query = value.get("query")
-                    if query:
-                        # Get the best image URL for this query
-                        image_url = image_service.get_best_image(query)
-                        if image_url:
-                            # Replace the query object with actual image data
-                            content[key] = {
-                                "type": "image",
-                                "url": image_url
-                            }
+        _resolve_image_queries(slides_data)
         
         template_path = os.path.join(TEMPLATES_DIR, template_filename)
-        tm = TemplateManager(template_path)
+        tm = _template_manager(template_path)
         
         output_path = tm.create_presentation(slides_data)
         
@@ -195,3 +235,29 @@ def build_presentation(request):
         
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def build_presentation_direct(request):
+    """
+    Same as build_presentation, but returns the PPTX itself instead of a download URL.
+    The file is built in memory and never written to MEDIA_ROOT.
+    """
+    try:
+        data = json.loads(request.body)
+        template_filename = data.get("template_filename")
+        slides_data = data.get("slides", []) # List of {layout_id, content}
+        
+        _resolve_image_queries(slides_data)
+        
+        template_path = os.path.join(TEMPLATES_DIR, template_filename)
+        tm = _template_manager(template_path)
+        
+        buf = tm.create_presentation(slides_data, output_stream=BytesIO())
+        
+        response = HttpResponse(buf.getvalue(), content_type=PPTX_CONTENT_TYPE)
+        response["Content-Disposition"] = 'attachment; filename="generated_lesson.pptx"'
+        return response
+        
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
@@ -3,27 +3,195 @@ Python-PPTX Template Manager - Refactored
 Clean API for loading templates, inspecting placeholders, and filling them with content
 """
 
+from lxml import etree
 from pptx import Presentation
+import pptx.presentation
+from pptx.enum.shapes import PP_PLACEHOLDER
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import qn
+from pptx.oxml.xmlchemy import OxmlElement
 from pptx.util import Pt
+from slides.services import pptx_fastpatch  # noqa: F401 (patches python-pptx on import)
+import copy
+import functools
+import io
 import os
-from typing import Dict, List, Any, Optional
+import posixpath
+import re
+import secrets
+import stat
+import sys
+import zipfile
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Union
+
+
+@functools.lru_cache(maxsize=32)
+def _load_template_bytes(path: str, mtime: float) -> bytes:
+    """
+    Read a template file once per version
+    
+    The mtime is part of the cache key, so a modified template is read again.
+    """
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+@dataclass(slots=True)
+class PlaceholderInfo:
+    """One placeholder as reported by TemplateManager.get_placeholder_info"""
+    idx: int
+    name: str
+    type: str
+    has_text_frame: bool
+    default_text: Optional[str] = None  # layouts only, set when the layout has prompt text
+    current_text: Optional[str] = None  # slides only, set when the shape has a text frame
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """The dictionary form returned before PlaceholderInfo existed"""
+        d = {
+            "idx": self.idx,
+            "name": self.name,
+            "type": self.type,
+            "has_text_frame": self.has_text_frame,
+        }
+        if self.default_text is not None:
+            d["default_text"] = self.default_text
+        if self.current_text is not None:
+            d["current_text"] = self.current_text
+        return d
+
+
+@dataclass(slots=True)
+class LayoutInfo:
+    """One slide layout and its placeholders"""
+    index: int
+    name: str
+    placeholders: List[PlaceholderInfo] = field(default_factory=list)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """The dictionary form returned before LayoutInfo existed"""
+        return {
+            "index": self.index,
+            "name": self.name,
+            "placeholders": [ph.to_dict() for ph in self.placeholders],
+        }
+
+
+# Display string per placeholder type, e.g. "TITLE (1)", formatted once instead of per placeholder
+_PH_TYPE_STR = {member: str(member) for member in PP_PLACEHOLDER}
+
+
+def _ph_type_str(ph_type) -> str:
+    return _PH_TYPE_STR.get(ph_type) or str(ph_type)
+
+
+_A_P, _A_R, _A_T, _A_BR = qn("a:p"), qn("a:r"), qn("a:t"), qn("a:br")
+# Control characters python-pptx writes as "_xHHHH_" escapes (tab and newline are kept)
+_CTRL_CHARS_RE = re.compile(r"[\x00-\x08\x0B-\x1F]")
+
+
+# text -> detached <a:txBody> holding the paragraphs built for it. Dummy data writes the
+# same few strings into many placeholders, so repeats are deep-copied instead of rebuilt.
+_PARAGRAPH_CACHE = {}
+_PARAGRAPH_CACHE_SIZE = 256
+
+
+def _build_paragraphs(text: str):
+    """Build the <a:p> elements for `text` (as python-pptx would) under a detached <a:txBody>"""
+    container = OxmlElement("a:txBody")
+    for line in text.split("\n"):
+        p = etree.SubElement(container, _A_P)
+        for i, run_text in enumerate(line.split("\v")):
+            if i:
+                etree.SubElement(p, _A_BR)
+            if run_text:
+                r = etree.SubElement(p, _A_R)
+                etree.SubElement(r, _A_T).text = _CTRL_CHARS_RE.sub(
+                    lambda m: "_x%04X_" % ord(m.group()), run_text
+                )
+    return container
+
+
+def _fast_set_text(shape, text: str):
+    """
+    Same result as `shape.text = text`, writing the <a:p>/<a:r>/<a:t> elements directly
+    
+    Args:
+        shape: Shape with a text frame
+        text: New text; "\n" starts a new paragraph, "\v" inserts a line break
+    """
+    txBody = shape.text_frame._txBody
+    for p in txBody.findall(_A_P):
+        txBody.remove(p)
+    
+    paragraphs = _PARAGRAPH_CACHE.get(text)
+    if paragraphs is None:
+        paragraphs = _build_paragraphs(text)
+        if len(_PARAGRAPH_CACHE) >= _PARAGRAPH_CACHE_SIZE:
+            _PARAGRAPH_CACHE.clear()
+        _PARAGRAPH_CACHE[text] = paragraphs
+    
+    # Only the paragraphs are shared; bodyPr/lstStyle stay the placeholder's own
+    for p in paragraphs:
+        txBody.append(copy.deepcopy(p))
+
+
+def _read_rels(z: zipfile.ZipFile, partname: str) -> List[tuple]:
+    """
+    Read the relationships of a package part straight from the zip
+    
+    Args:
+        z: The opened .pptx package
+        partname: Zip member name of the part ("" for the package itself)
+        
+    Returns:
+        List of (rId, relationship type, target member name) for internal targets
+    """
+    base, name = posixpath.split(partname)
+    rels = parse_xml(z.read(posixpath.join(base, "_rels", name + ".rels")))
+    result = []
+    for rel in rels:
+        if rel.get("TargetMode") == "External":
+            continue
+        target = rel.get("Target")
+        if target.startswith("/"):
+            target = target[1:]
+        else:
+            target = posixpath.normpath(posixpath.join(base, target))
+        result.append((rel.get("Id"), rel.get("Type"), target))
+    return result
 
 
 class TemplateManager:
     """Manages PowerPoint template operations"""
     
-    def __init__(self, template_path: str):
+    def __init__(self, template: Union[str, os.PathLike, pptx.presentation.Presentation]):
         """
-        Initialize with a template file
+        Initialize with a template file or an already open presentation
         
         Args:
-            template_path: Path to the .pptx template file
+            template: Path to the .pptx template file (str or path-like), or a python-pptx Presentation
+                (used as-is, not copied, so slides are added to that object)
         """
-        if not os.path.exists(template_path):
-            raise FileNotFoundError(f"Template not found: {template_path}")
+        if not isinstance(template, (str, os.PathLike)):
+            # Already parsed, so there is no file to read and no package bytes to scan
+            self.template_path = "<in-memory>"
+            self._template_bytes = None
+            self.presentation = template
+            return
         
+        template_path = os.fspath(template)
         self.template_path = template_path
-        self.presentation = Presentation(template_path)
+        try:
+            self._template_bytes = _load_template_bytes(template_path, os.path.getmtime(template_path))
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Template not found: {template_path}") from None
+    
+    @functools.cached_property
+    def presentation(self):
+        """The template as a python-pptx Presentation, parsed on first use"""
+        return Presentation(io.BytesIO(self._template_bytes))
     
     def get_placeholder_info(self, slide_index: int = None) -> Dict[str, Any]:
         """
@@ -33,14 +201,16 @@ class TemplateManager:
             slide_index: If provided, get info for specific slide. Otherwise, get template layout info
             
         Returns:
-            Dictionary containing placeholder information
+            Dictionary containing placeholder information; "layouts" holds LayoutInfo
+            and "placeholders" holds PlaceholderInfo objects (use .to_dict() for plain dicts)
         """
         if slide_index is not None:
             # Get info for a specific slide
-            if slide_index >= len(self.presentation.slides):
+            slides = self.presentation.slides
+            if slide_index >= len(slides):
                 return {"error": f"Slide {slide_index} does not exist"}
             
-            slide = self.presentation.slides[slide_index]
+            slide = slides[slide_index]
             return self._extract_slide_placeholder_info(slide, slide_index)
         else:
             # Get info for all layouts in template
@@ -48,31 +218,92 @@ class TemplateManager:
     
     def _extract_layout_info(self) -> Dict[str, Any]:
         """Extract placeholder information from all layouts"""
+        if self._template_bytes is None:
+            return self._extract_layout_info_from_presentation()
+        try:
+            return self._extract_layout_info_from_zip()
+        except Exception as e:
+            print(f"⚠️ Fast layout scan failed ({e}), falling back to python-pptx")
+            return self._extract_layout_info_from_presentation()
+    
+    def _extract_layout_info_from_zip(self) -> Dict[str, Any]:
+        """
+        Same result as _extract_layout_info_from_presentation, but only the package
+        relationships, presentation, first slide master and its layout parts are parsed
+        (no slides, themes, notes or media), and no shape proxies are created
+        """
+        layout_info = {
+            "template_path": self.template_path,
+            "total_layouts": 0,
+            "layouts": []
+        }
+        
+        with zipfile.ZipFile(io.BytesIO(self._template_bytes)) as z:
+            pres_part = next(
+                target for _, rel_type, target in _read_rels(z, "")
+                if rel_type.endswith("/officeDocument")
+            )
+            presentation = parse_xml(z.read(pres_part))
+            pres_rels = {r_id: target for r_id, _, target in _read_rels(z, pres_part)}
+            
+            # Presentation.slide_layouts are the layouts of the first slide master
+            master_part = pres_rels[presentation.sldMasterIdLst.sldMasterId_lst[0].rId]
+            master = parse_xml(z.read(master_part))
+            master_rels = {r_id: target for r_id, _, target in _read_rels(z, master_part)}
+            layout_ids = master.sldLayoutIdLst.sldLayoutId_lst
+            layout_info["total_layouts"] = len(layout_ids)
+            
+            for idx, layout_id in enumerate(layout_ids):
+                layout = parse_xml(z.read(master_rels[layout_id.rId]))
+                layout_data = LayoutInfo(idx, layout.cSld.name)
+                
+                for ph_elm in layout.cSld.spTree.iter_ph_elms():
+                    ph = ph_elm.ph
+                    # Only <p:sp> placeholders have a text frame (pictures, tables etc. don't)
+                    has_text_frame = ph_elm.tag == qn("p:sp")
+                    ph_info = PlaceholderInfo(ph.idx, ph_elm.shape_name, _ph_type_str(ph.type), has_text_frame)
+                    
+                    txBody = ph_elm.txBody if has_text_frame else None
+                    if txBody is not None:
+                        text = "\n".join(p.text for p in txBody.p_lst)
+                        if text:
+                            ph_info.default_text = text
+                    
+                    layout_data.placeholders.append(ph_info)
+                
+                layout_info["layouts"].append(layout_data)
+        
+        return layout_info
+    
+    def _extract_layout_info_from_presentation(self) -> Dict[str, Any]:
+        """Extract placeholder information from all layouts by walking python-pptx objects"""
+        slide_layouts = self.presentation.slide_layouts
         layout_info = {
             "template_path": self.template_path,
-            "total_layouts": len(self.presentation.slide_layouts),
+            "total_layouts": len(slide_layouts),
             "layouts": []
         }
         
-        for idx, layout in enumerate(self.presentation.slide_layouts):
-            layout_data = {
-                "index": idx,
-                "name": layout.name,
-                "placeholders": []
-            }
+        for idx, layout in enumerate(slide_layouts):
+            layout_data = LayoutInfo(idx, layout.name)
             
             for placeholder in layout.placeholders:
-                ph_info = {
-                    "idx": placeholder.placeholder_format.idx,
-                    "name": placeholder.name,
-                    "type": str(placeholder.placeholder_format.type),
-                    "has_text_frame": placeholder.has_text_frame,
-                }
+                # Read idx/type off the <p:ph> element once instead of through placeholder_format
+                ph = placeholder._element.ph
+                ph_info = PlaceholderInfo(
+                    ph.idx,
+                    placeholder.name,
+                    _ph_type_str(ph.type),
+                    placeholder.has_text_frame,
+                )
                 
-                if placeholder.has_text_frame and placeholder.text:
-                    ph_info["default_text"] = placeholder.text
+                if placeholder.has_text_frame:
+                    # .text joins every paragraph/run, so read it only once
+                    text = placeholder.text
+                    if text:
+                        ph_info.default_text = text
                 
-                layout_data["placeholders"].append(ph_info)
+                layout_data.placeholders.append(ph_info)
             
             layout_info["layouts"].append(layout_data)
         
@@ -85,57 +316,62 @@ class TemplateManager:
             "placeholders": []
         }
         
-        for shape in slide.shapes:
-            if shape.is_placeholder:
-                ph_info = {
-                    "idx": shape.placeholder_format.idx,
-                    "name": shape.name,
-                    "type": str(shape.placeholder_format.type),
-                    "has_text_frame": shape.has_text_frame,
-                }
-                
-                if shape.has_text_frame:
-                    ph_info["current_text"] = shape.text
-                
-                slide_info["placeholders"].append(ph_info)
+        # slide.placeholders yields the same shapes as filtering slide.shapes on is_placeholder
+        for shape in slide.placeholders:
+            ph = shape._element.ph
+            ph_info = PlaceholderInfo(
+                ph.idx,
+                shape.name,
+                _ph_type_str(ph.type),
+                shape.has_text_frame,
+            )
+            
+            if ph_info.has_text_frame:
+                ph_info.current_text = shape.text
+            
+            slide_info["placeholders"].append(ph_info)
         
         return slide_info
     
     def print_placeholder_info(self, slide_index: int = None):
         """Print placeholder information in a readable format"""
         info = self.get_placeholder_info(slide_index)
+        # Collect the lines and write them in one go instead of one print() per line
+        out = []
         
         if slide_index is None:
             # Print layout information
-            print(f"\n{'='*70}")
-            print(f"TEMPLATE: {info['template_path']}")
-            print(f"{'='*70}\n")
-            print(f"Total Layouts: {info['total_layouts']}\n")
+            out.append(f"\n{'='*70}")
+            out.append(f"TEMPLATE: {info['template_path']}")
+            out.append(f"{'='*70}\n")
+            out.append(f"Total Layouts: {info['total_layouts']}\n")
             
             for layout in info['layouts']:
-                print(f"Layout {layout['index']}: {layout['name']}")
-                print("-" * 70)
-                if not layout['placeholders']:
-                    print("  No placeholders\n")
+                out.append(f"Layout {layout.index}: {layout.name}")
+                out.append("-" * 70)
+                if not layout.placeholders:
+                    out.append("  No placeholders\n")
                     continue
                 
-                for ph in layout['placeholders']:
-                    print(f"  Placeholder {ph['idx']}: {ph['name']}")
-                    print(f"    Type: {ph['type']}")
-                    print(f"    Has Text Frame: {ph['has_text_frame']}")
-                    if 'default_text' in ph:
-                        print(f"    Default: '{ph['default_text'][:50]}...'")
-                    print()
+                for ph in layout.placeholders:
+                    out.append(f"  Placeholder {ph.idx}: {ph.name}")
+                    out.append(f"    Type: {ph.type}")
+                    out.append(f"    Has Text Frame: {ph.has_text_frame}")
+                    if ph.default_text is not None:
+                        out.append(f"    Default: '{ph.default_text[:50]}...'")
+                    out.append("")
         else:
             # Print slide information
-            print(f"\nSlide {info['slide_index']} Placeholders:")
-            print("-" * 70)
+            out.append(f"\nSlide {info['slide_index']} Placeholders:")
+            out.append("-" * 70)
             for ph in info['placeholders']:
-                print(f"  Placeholder {ph['idx']}: {ph['name']}")
-                print(f"    Type: {ph['type']}")
-                if 'current_text' in ph:
-                    print(f"    Text: '{ph['current_text'][:50]}...'")
-                print()
+                out.append(f"  Placeholder {ph.idx}: {ph.name}")
+                out.append(f"    Type: {ph.type}")
+                if ph.current_text is not None:
+                    out.append(f"    Text: '{ph.current_text[:50]}...'")
+                out.append("")
+        
+        sys.stdout.write("\n".join(out) + "\n")
     
     def add_slide(self, layout_index: int, placeholder_data: Dict[int, str]) -> int:
         """
@@ -148,20 +384,28 @@ class TemplateManager:
         Returns:
             Index of the newly created slide
         """
-        if layout_index >= len(self.presentation.slide_layouts):
+        prs = self.presentation
+        slide_layouts = prs.slide_layouts
+        if layout_index >= len(slide_layouts):
             raise ValueError(f"Layout {layout_index} does not exist")
         
-        slide = self.presentation.slides.add_slide(self.presentation.slide_layouts[layout_index])
+        slides = prs.slides
+        slide = slides.add_slide(slide_layouts[layout_index])
+        
+        # Map placeholder idx -> shape once (first one wins, as in document order)
+        idx_map = {}
+        for shape in slide.placeholders:
+            idx_map.setdefault(shape._element.ph_idx, shape)
         
         # Fill placeholders
         for ph_idx, content in placeholder_data.items():
-            for shape in slide.shapes:
-                if shape.is_placeholder and shape.placeholder_format.idx == ph_idx:
-                    if shape.has_text_frame:
-                        shape.text = content
-                    break
+            shape = idx_map.get(ph_idx)
+            if shape is not None and shape.has_text_frame:
+                _fast_set_text(shape, content)
         
-        return len(self.presentation.slides) - 1
+        # New slides are appended. Count them rather than keep a counter, which would go
+        # stale when slides are added through .presentation directly
+        return len(slides) - 1
     
     def fill_placeholder(self, slide_index: int, placeholder_index: int, content: str) -> bool:
         """
@@ -175,67 +419,111 @@ class TemplateManager:
         Returns:
             True if successful, False otherwise
         """
-        if slide_index >= len(self.presentation.slides):
+        slides = self.presentation.slides
+        if slide_index >= len(slides):
             print(f"❌ Slide {slide_index} does not exist")
             return False
         
-        slide = self.presentation.slides[slide_index]
+        slide = slides[slide_index]
+        
+        # Lookup by idx on the XML, only the matching placeholder gets a shape proxy
+        try:
+            shape = slide.placeholders[placeholder_index]
+        except KeyError:
+            print(f"❌ Placeholder {placeholder_index} not found in slide {slide_index}")
+            return False
         
-        for shape in slide.shapes:
-            if shape.is_placeholder and shape.placeholder_format.idx == placeholder_index:
-                if shape.has_text_frame:
-                    shape.text = content
-                    return True
-                else:
-                    print(f"❌ Placeholder {placeholder_index} has no text frame")
-                    return False
+        if not shape.has_text_frame:
+            print(f"❌ Placeholder {placeholder_index} has no text frame")
+            return False
         
-        print(f"❌ Placeholder {placeholder_index} not found in slide {slide_index}")
-        return False
+        _fast_set_text(shape, content)
+        return True
     
     def save(self, output_path: str):
         """Save the presentation to a file"""
-        self.presentation.save(output_path)
+        # Write to a temp file in the same directory and swap it in atomically, so a failed
+        # save never leaves a truncated .pptx at output_path
+        out_dir = os.path.dirname(os.path.abspath(output_path))
+        base = os.path.basename(output_path)
+        while True:
+            tmp_path = os.path.join(out_dir, f".{base}.{secrets.token_hex(4)}.tmp")
+            try:
+                # 0o666 like a plain open(), so the process umask applies as usual
+                fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+                break
+            except FileExistsError:
+                continue
+        try:
+            with os.fdopen(fd, "wb") as f:
+                self.presentation.save(f)
+            # Overwriting in place kept the existing file's mode, so keep doing that
+            try:
+                os.chmod(tmp_path, stat.S_IMODE(os.stat(output_path).st_mode))
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
         print(f"✅ Saved presentation to: {output_path}")
 
 
-def generate_dummy_content(layout_name: str, placeholder_info: Dict) -> str:
+# Keyword groups in priority order: each alternative is a lookahead over the whole name,
+# so the first group found anywhere in it wins (m.lastindex), in one regex call.
+# "title" is checked first, as in the original if/elif chain, so names containing
+# "subtitle" get title text and group 2 is effectively unreachable.
+_KEYWORD_RE = re.compile(
+    r"^(?:(?=.*(title))|(?=.*(subtitle))|(?=.*(content|body|text))|(?=.*(picture|image))"
+    r"|(?=.*(date))|(?=.*(footer))|(?=.*(slide number|number)))",
+    re.DOTALL
+)
+
+_BULLETS = (
+    "Automatically generated content\n\n"
+    "• Bullet point 1 - Sample text\n"
+    "• Bullet point 2 - More sample text\n"
+    "• Bullet point 3 - Additional content\n"
+    "• Bullet point 4 - Final point"
+)
+
+# Dummy content per _KEYWORD_RE group number
+_DUMMY_CONTENT = {
+    1: lambda layout_name: f"Sample Title for {layout_name}",
+    2: lambda layout_name: "Subtitle: Auto-generated content for demonstration",
+    3: lambda layout_name: _BULLETS,
+    4: lambda layout_name: "[Image placeholder - would insert image here]",
+    5: lambda layout_name: "January 13, 2026",
+    6: lambda layout_name: "Auto-generated Presentation",
+    7: lambda layout_name: "1",
+}
+
+
+def generate_dummy_content(layout_name: str, placeholder_info) -> str:
     """
     Generate dummy content based on placeholder type and position
     
     Args:
         layout_name: Name of the layout
-        placeholder_info: Placeholder information dictionary
+        placeholder_info: PlaceholderInfo (or its dictionary form)
         
     Returns:
         Dummy content string
     """
-    ph_name = placeholder_info['name'].lower()
-    ph_type = placeholder_info['type']
-    
-    # Generate content based on placeholder type
-    if 'title' in ph_name:
-        return f"Sample Title for {layout_name}"
-    elif 'subtitle' in ph_name:
-        return f"Subtitle: Auto-generated content for demonstration"
-    elif 'content' in ph_name or 'body' in ph_name or 'text' in ph_name:
-        return (
-            "Automatically generated content\n\n"
-            "• Bullet point 1 - Sample text\n"
-            "• Bullet point 2 - More sample text\n"
-            "• Bullet point 3 - Additional content\n"
-            "• Bullet point 4 - Final point"
-        )
-    elif 'picture' in ph_name or 'image' in ph_name:
-        return "[Image placeholder - would insert image here]"
-    elif 'date' in ph_name:
-        return "January 13, 2026"
-    elif 'footer' in ph_name:
-        return "Auto-generated Presentation"
-    elif 'slide number' in ph_name or 'number' in ph_name:
-        return "1"
-    else:
-        return f"Sample content for {placeholder_info['name']}"
+    if isinstance(placeholder_info, dict):
+        return _dummy_content(layout_name, placeholder_info['name'])
+    return _dummy_content(layout_name, placeholder_info.name)
+
+
+@functools.lru_cache(maxsize=256)
+def _dummy_content(layout_name: str, ph_name: str) -> str:
+    """generate_dummy_content for one (layout, placeholder name); slides reusing a layout hit the cache"""
+    # Generate content based on keywords in the placeholder name
+    m = _KEYWORD_RE.match(ph_name.lower())
+    if m:
+        return _DUMMY_CONTENT[m.lastindex](layout_name)
+    return f"Sample content for {ph_name}"
 
 
 def create_sample_presentation_with_dummy_data(template_path: str, output_path: str, num_slides: int = 5):
@@ -258,39 +546,42 @@ def create_sample_presentation_with_dummy_data(template_path: str, output_path:
     layout_info = tm.get_placeholder_info()
     
     # Select layouts to use (cycle through available layouts)
-    available_layouts = [l for l in layout_info['layouts'] if l['placeholders']]
+    available_layouts = [l for l in layout_info['layouts'] if l.placeholders]
     
     if not available_layouts:
         print("❌ No layouts with placeholders found")
         return
     
-    # Add slides with dummy content
+    # Add slides with dummy content (progress lines are buffered and written once)
+    out = []
     for i in range(num_slides):
         layout = available_layouts[i % len(available_layouts)]
-        layout_idx = layout['index']
-        layout_name = layout['name']
+        layout_idx = layout.index
+        layout_name = layout.name
         
-        print(f"Adding slide {i+1} using layout '{layout_name}'...")
+        out.append(f"Adding slide {i+1} using layout '{layout_name}'...")
         
         # Generate dummy content for each placeholder
         placeholder_data = {}
-        for ph in layout['placeholders']:
-            if ph['has_text_frame']:
+        for ph in layout.placeholders:
+            if ph.has_text_frame:
                 content = generate_dummy_content(layout_name, ph)
-                placeholder_data[ph['idx']] = content
-                print(f"  Placeholder {ph['idx']} ({ph['name']}): {content[:40]}...")
+                placeholder_data[ph.idx] = content
+                out.append(f"  Placeholder {ph.idx} ({ph.name}): {content[:40]}...")
         
         # Add the slide
         tm.add_slide(layout_idx, placeholder_data)
-        print()
+        out.append("")
+    if out:
+        sys.stdout.write("\n".join(out) + "\n")
     
     # Save the presentation
     tm.save(output_path)
     print(f"\n✅ Created {num_slides} slides with dummy data")
 
 
-def create_sample_template():
-    """Create a sample template for testing"""
+def create_sample_template_prs() -> pptx.presentation.Presentation:
+    """Build the sample template in memory, without saving it"""
     print("Creating sample template...")
     prs = Presentation()
     
@@ -299,7 +590,12 @@ def create_sample_template():
     prs.slides.add_slide(prs.slide_layouts[1])  # Title and Content
     prs.slides.add_slide(prs.slide_layouts[3])  # Two Content
     prs.slides.add_slide(prs.slide_layouts[5])  # Title Only
-    
+    return prs
+
+
+def create_sample_template():
+    """Create a sample template for testing"""
+    prs = create_sample_template_prs()
     template_name = "sample_template.pptx"
     prs.save(template_name)
     print(f"✓ Created: {template_name}\n")